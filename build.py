@@ -22,7 +22,7 @@ except subprocess.CalledProcessError:
 print("Installing required packages...")
 try:
     subprocess.run([PYTHON_EXECUTABLE, "-m", "pip", "install",
-                   "pyodbc", "requests"], check=True)
+                   "pyodbc", "requests", "orjson", "tqdm"], check=True)
     print("Required packages installed.")
 except subprocess.CalledProcessError:
     print("Failed to install required packages. Please install manually.")
@@ -7,8 +7,10 @@ Run this before running sync.py to test connectivity and API endpoints
 import os
 import sys
 import json
-import requests
 import logging
+import functools
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
 
 # Setup logging
 logging.basicConfig(
@@ -23,6 +25,25 @@ logger = logging.getLogger(__name__)
 
 CONFIG_FILE = 'config.json'
 
+# Shared HTTP session so all probes reuse pooled keep-alive connections.
+# requests is imported lazily (here and in the probes) to keep startup fast.
+SESSION = None
+
+
+def mount_session(api_base_url):
+    """Create the shared session with a pooled, retrying HTTP adapter for the API server"""
+    global SESSION
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    # No retries, so a probe is bounded by its own timeout; read=False re-raises
+    # read timeouts as-is so they report as TIMEOUT rather than a connection error
+    retry = Retry(total=0, read=False)
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+    SESSION = requests.Session()
+    SESSION.mount(api_base_url, adapter)
+
 
 def load_config():
     """Load configuration from config.json file"""
@@ -37,6 +58,95 @@ def load_config():
         sys.exit(1)
 
 
+@functools.lru_cache(maxsize=None)
+def _probe_host(origin):
+    """Return False only if the server at origin cannot be connected to.
+
+    Any HTTP response counts as reachable, and so does a read timeout or other
+    error after the connection was made - a slow site root is common.
+    """
+    import requests
+    from urllib3.exceptions import ReadTimeoutError
+    try:
+        # stream=True: the status line is enough, don't wait for the body
+        SESSION.get(origin, timeout=3, stream=True).close()
+    except requests.exceptions.ConnectTimeout:
+        return False
+    except requests.exceptions.ConnectionError as e:
+        # urllib3 may report a read timeout wrapped in MaxRetryError, which requests
+        # raises as ConnectionError - the host still accepted the connection then
+        reason = getattr(e.args[0], 'reason', None) if e.args else None
+        return isinstance(reason, ReadTimeoutError)
+    except requests.exceptions.RequestException:
+        pass
+    return True
+
+
+def _probe(url, endpoint, method, description, headers):
+    """Probe a single endpoint and return its result dict"""
+    import requests
+    try:
+        logger.info(f"Testing {method} {url} ({description})...")
+
+        if method == "DELETE":
+            # For DELETE endpoints, we just test if they respond
+            # We don't actually want to delete data in diagnostics mode
+            response = SESSION.options(
+                url, headers=headers, timeout=5)
+            # Just check if the server is responsive
+            status = "AVAILABLE" if response.status_code < 500 else "ERROR"
+        elif method == "POST":
+            # For POST endpoints, we just test if they respond to a GET (will likely return 405 Method Not Allowed)
+            response = SESSION.options(
+                url, headers=headers, timeout=5)
+            # Just check if the server is responsive
+            status = "AVAILABLE" if response.status_code < 500 else "ERROR"
+
+        # Check for Django debug page
+        is_debug = False
+        if b"<code>DEBUG = True</code>" in response.content:
+            is_debug = True
+
+        logger.info(
+            f"  - {method} {endpoint} Status: {status} (Code: {response.status_code})")
+        if is_debug:
+            logger.warning(
+                f"  - DJANGO DEBUG MODE DETECTED on {endpoint}")
+
+        return {
+            "endpoint": endpoint,
+            "method": method,
+            "status_code": response.status_code,
+            "status": status,
+            "debug_mode": is_debug
+        }
+
+    except requests.exceptions.Timeout:
+        logger.error(f"  - Timeout accessing {url}")
+        return {
+            "endpoint": endpoint,
+            "method": method,
+            "status": "TIMEOUT",
+            "debug_mode": False
+        }
+    except requests.exceptions.ConnectionError:
+        logger.error(f"  - Connection error accessing {url}")
+        return {
+            "endpoint": endpoint,
+            "method": method,
+            "status": "CONNECTION ERROR",
+            "debug_mode": False
+        }
+    except Exception as e:
+        logger.error(f"  - Unexpected error: {str(e)}")
+        return {
+            "endpoint": endpoint,
+            "method": method,
+            "status": f"ERROR: {str(e)}",
+            "debug_mode": False
+        }
+
+
 def test_api_endpoints(config):
     """Test API endpoints to ensure they are accessible and working correctly"""
     try:
@@ -49,6 +159,7 @@ def test_api_endpoints(config):
         }
 
         logger.info(f"Testing API connection to {api_base_url}...")
+        mount_session(api_base_url)
 
         # List of endpoints to test
         endpoints = [
@@ -62,80 +173,65 @@ def test_api_endpoints(config):
             ("/api/sync/users", "POST", "Sync users")
         ]
 
-        results = []
-
-        # Test each endpoint with a simple request
-        for endpoint, method, description in endpoints:
-            try:
-                url = f"{api_base_url}{endpoint}"
-                logger.info(f"Testing {method} {url} ({description})...")
-
-                if method == "DELETE":
-                    # For DELETE endpoints, we just test if they respond
-                    # We don't actually want to delete data in diagnostics mode
-                    response = requests.options(
-                        url, headers=headers, timeout=5)
-                    # Just check if the server is responsive
-                    status = "AVAILABLE" if response.status_code < 500 else "ERROR"
-                elif method == "POST":
-                    # For POST endpoints, we just test if they respond to a GET (will likely return 405 Method Not Allowed)
-                    response = requests.options(
-                        url, headers=headers, timeout=5)
-                    # Just check if the server is responsive
-                    status = "AVAILABLE" if response.status_code < 500 else "ERROR"
-
-                # Check for Django debug page
-                is_debug = False
-                if hasattr(response, 'text') and "<code>DEBUG = True</code>" in response.text:
-                    is_debug = True
-
-                results.append({
+        # Tally issues as results arrive instead of re-scanning them afterwards
+        errors = []
+        debug_mode = False
+
+        def record(result):
+            nonlocal debug_mode
+            if result["status"] != "AVAILABLE":
+                errors.append(result)
+            debug_mode = debug_mode or result["debug_mode"]
+
+        # All endpoints share one host - if it cannot be reached at all,
+        # report that once instead of waiting for every probe to time out
+        parts = urlsplit(api_base_url)
+        if not _probe_host(f"{parts.scheme}://{parts.netloc}"):
+            logger.error(f"  - Host unreachable: {parts.netloc}")
+            for endpoint, method, _ in endpoints:
+                record({
                     "endpoint": endpoint,
                     "method": method,
-                    "status_code": response.status_code,
-                    "status": status,
-                    "debug_mode": is_debug
-                })
-
-                logger.info(
-                    f"  - Status: {status} (Code: {response.status_code})")
-                if is_debug:
-                    logger.warning(
-                        f"  - DJANGO DEBUG MODE DETECTED on {endpoint}")
-
-            except requests.exceptions.Timeout:
-                logger.error(f"  - Timeout accessing {url}")
-                results.append({
-                    "endpoint": endpoint,
-                    "method": method,
-                    "status": "TIMEOUT",
-                    "debug_mode": False
-                })
-            except requests.exceptions.ConnectionError:
-                logger.error(f"  - Connection error accessing {url}")
-                results.append({
-                    "endpoint": endpoint,
-                    "method": method,
-                    "status": "CONNECTION ERROR",
-                    "debug_mode": False
-                })
-            except Exception as e:
-                logger.error(f"  - Unexpected error: {str(e)}")
-                results.append({
-                    "endpoint": endpoint,
-                    "method": method,
-                    "status": f"ERROR: {str(e)}",
+                    "status": "HOST_UNREACHABLE",
                     "debug_mode": False
                 })
+        else:
+            # Probe all endpoints concurrently - each probe is just a network wait.
+            # Not a with-block: a probe still hanging at the cut-off is reported
+            # as TIMEOUT and left behind instead of delaying the summary
+            executor = ThreadPoolExecutor(max_workers=len(endpoints))
+            try:
+                futures = {
+                    executor.submit(_probe, f"{api_base_url}{endpoint}",
+                                    endpoint, method, description, headers): (endpoint, method)
+                    for endpoint, method, description in endpoints
+                }
+                pending = set(futures)
+                try:
+                    for future in as_completed(futures, timeout=10):
+                        pending.discard(future)
+                        record(future.result())
+                except FuturesTimeoutError:
+                    for future in pending:
+                        endpoint, method = futures[future]
+                        logger.error(f"  - Timeout waiting for {method} {endpoint}")
+                        record({
+                            "endpoint": endpoint,
+                            "method": method,
+                            "status": "TIMEOUT",
+                            "debug_mode": False
+                        })
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+        # Keep the summary in the declared endpoint order
+        order = [endpoint for endpoint, _, _ in endpoints]
+        errors.sort(key=lambda r: order.index(r["endpoint"]))
 
         # Summary
         logger.info("\n===== DIAGNOSTICS SUMMARY =====")
         logger.info(f"API Base URL: {api_base_url}")
 
-        # Count issues
-        errors = [r for r in results if r["status"] != "AVAILABLE"]
-        debug_mode = any(r["debug_mode"] for r in results)
-
         if errors:
             logger.warning(f"Found {len(errors)} endpoint issues:")
             for error in errors:
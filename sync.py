@@ -2,24 +2,25 @@
 import os
 import sys
 import json
+import gzip
+import hashlib
+import itertools
 import time
 import logging
-import requests
-import pyodbc
-from datetime import datetime, date
+import queue
+import threading
+import orjson
+from tqdm import tqdm
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED, ALL_COMPLETED
+from datetime import datetime
 from decimal import Decimal
 
 
-# Custom JSON encoder to handle Decimal objects and date objects
-class DecimalEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, Decimal):
-            return float(obj)
-        elif isinstance(obj, date):
-            return obj.isoformat()  # Convert date to ISO format string (YYYY-MM-DD)
-        elif isinstance(obj, datetime):
-            return obj.isoformat()  # Convert datetime to ISO format string
-        return super(DecimalEncoder, self).default(obj)
+def _json_default(obj):
+    """Serialize values orjson does not handle natively (dates and datetimes it does)"""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
 
 
 # Setup logging with better formatting
@@ -35,6 +36,40 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 CONFIG_FILE = 'config.json'
+STATE_FILE = 'sync_state.json'
+MAX_RETRIES = 3
+
+# Shared HTTP session so every request to the API reuses pooled keep-alive connections.
+# Created by mount_session() so requests is only imported once the upload starts.
+SESSION = None
+
+
+def mount_session(api_base_url, pool_size=4):
+    """Create the shared session with a pooled, retrying HTTP adapter for the API server"""
+    global SESSION
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    # Read errors are never retried: once a POST has been sent the server may
+    # already have inserted the chunk, and appending it again duplicates rows.
+    # read=False (not 0) re-raises the timeout itself instead of "Max retries".
+    # 502/504 are left out for the same reason - the proxy gave up on a worker
+    # that may have committed; 503 means the request was turned away unprocessed.
+    retry = Retry(
+        total=MAX_RETRIES,
+        read=False,
+        backoff_factor=0.5,
+        status_forcelist=[503],
+        allowed_methods=frozenset(['GET', 'HEAD', 'OPTIONS', 'POST', 'DELETE']),
+        raise_on_status=False  # Hand back the last response so its error can be shown
+    )
+    # One kept-alive connection per upload worker; pool_block makes a worker wait for
+    # a free connection instead of opening a throwaway one when the pool is busy
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size,
+                          pool_block=True, max_retries=retry)
+    SESSION = requests.Session()
+    SESSION.mount(api_base_url, adapter)
 
 
 def print_header():
@@ -46,17 +81,6 @@ def print_header():
     print("=" * 70 + "\n")
 
 
-def print_progress_bar(current, total, prefix='Progress', bar_length=40):
-    """Print a progress bar"""
-    percent = float(current) * 100 / total
-    filled_length = int(bar_length * current // total)
-    bar = '█' * filled_length + '-' * (bar_length - filled_length)
-    print(f'\r{prefix}: |{bar}| {percent:.1f}% ({current}/{total})',
-          end='', flush=True)
-    if current == total:
-        print()  # New line when complete
-
-
 def load_config():
     """Load configuration from config.json file"""
     try:
@@ -77,8 +101,30 @@ def load_config():
         sys.exit(1)
 
 
+def load_sync_state(config):
+    """Load per-table state saved by previous runs against the same API and database"""
+    scope = {"api": config['api']['url'], "database": config.get('target_database', 'OMEGA')}
+    try:
+        with open(STATE_FILE, 'r') as f:
+            state = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        state = {}
+    if state.get("scope") != scope:
+        state = {"scope": scope, "tables": {}}
+    state.setdefault("watermarks", {})
+    return state
+
+
+def save_sync_state(state):
+    """Write sync state to disk so an interrupted run resumes from it"""
+    with open(STATE_FILE, 'wb') as f:
+        f.write(orjson.dumps(state, default=_json_default, option=orjson.OPT_INDENT_2))
+
+
 def connect_to_database(config):
     """Connect to SQL Anywhere database using ODBC"""
+    # Imported here so the ODBC driver manager is only loaded once it is needed
+    import pyodbc
     try:
         print("🔌 Connecting to database...")
         dsn = config['database']['dsn']
@@ -89,7 +135,8 @@ def connect_to_database(config):
         print(f"   → User: {username}")
 
         conn_str = f"DSN={dsn};UID={username};PWD={password}"
-        conn = pyodbc.connect(conn_str)
+        # Autocommit: the sync only reads, so skip transaction bookkeeping
+        conn = pyodbc.connect(conn_str, autocommit=True)
 
         print("✅ Database connection successful!\n")
         return conn
@@ -104,71 +151,237 @@ def connect_to_database(config):
         sys.exit(1)
 
 
-def execute_query(conn, query):
-    """Execute SQL query and return results as a list of dictionaries"""
+# Queries for every table to sync, in upload order
+SYNC_TABLES = [
+    ("acc_product", 'SELECT "code", "name", COALESCE("quantity", 0) + COALESCE("openingquantity", 0) AS quantity, "stockcatagory", "unit", "product", "brand", "billedcost", "basicprice", "partqty" FROM "acc_product"'),
+
+    ("acc_invmast", 'SELECT "invdate", "slno" FROM "acc_invmast" WHERE "billno" > 1'),
+
+    # Detail rows are sent ordered by product code so the server can merge them
+    # on ingest; the document key breaks ties so the order is repeatable
+    ("acc_invdetails", 'SELECT "invno", "code", "quantity" FROM "acc_invdetails" ORDER BY "code", "invno"'),
+
+    ("acc_purchasemaster", 'SELECT "slno", "date", "pdate" FROM "acc_purchasemaster" WHERE "billno" > 1'),
+
+    ("acc_purchasedetails", 'SELECT "billno", "code", "quantity" FROM "acc_purchasedetails" ORDER BY "code", "billno"'),
+
+    ("acc_production", 'SELECT "productionno", "date" FROM "acc_production"'),
+
+    ("acc_productiondetails", 'SELECT "masterno", "code", "qty" FROM "acc_productiondetails" ORDER BY "code", "masterno"'),
+
+    ("acc_users", 'SELECT "id", "pass" FROM "acc_users" WHERE "role" = \'Level 2\''),
+]
+
+# Column renames applied before upload, per table
+COLUMN_RENAMES = {
+    "acc_users": {"pass": "pass_field"},
+}
+
+# Append-only tables and the increasing key used as their incremental sync watermark
+WATERMARK_COLUMNS = {
+    "acc_invmast": "slno",
+    "acc_invdetails": "invno",
+    "acc_purchasemaster": "slno",
+    "acc_purchasedetails": "billno",
+    "acc_production": "productionno",
+    "acc_productiondetails": "masterno",
+}
+
+# Detail tables whose newest document may still be open for new lines; incremental
+# sync holds that document back so its lines are never split across the watermark
+HOLD_BACK_NEWEST = {"acc_invdetails", "acc_purchasedetails", "acc_productiondetails"}
+
+CHUNK_SIZE = 1000   # Rows per upload batch
+FETCH_SIZE = 10000  # Rows per database fetch
+
+
+def count_rows(conn, query, params=()):
+    """Return the number of rows a query yields (0 if the query fails)"""
+    import pyodbc
     try:
         cursor = conn.cursor()
-        cursor.execute(query)
-        columns = [column[0] for column in cursor.description]
-        results = []
-        for row in cursor.fetchall():
-            results.append(dict(zip(columns, row)))
+        # Ordering is irrelevant to a count, so leave it out of the derived table
+        query = query.partition(" ORDER BY ")[0]
+        cursor.execute(f"SELECT COUNT(*) FROM ({query}) AS t", *params)
+        count = cursor.fetchone()[0]
         cursor.close()
-        return results
+        return count
     except pyodbc.Error as e:
         print(f"❌ Query execution failed: {e}")
-        return []
+        return 0
+
+
+def iter_rows(conn, query, params=(), arraysize=FETCH_SIZE):
+    """Execute SQL query and return (columns, generator of row batches)"""
+    cursor = conn.cursor()
+    cursor.arraysize = arraysize
+    cursor.execute(query, *params)
+    columns = [column[0] for column in cursor.description]
+
+    def batches():
+        try:
+            while True:
+                rows = cursor.fetchmany(arraysize)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            cursor.close()
+
+    return columns, batches()
+
+
+def rechunk(batches, size=CHUNK_SIZE):
+    """Regroup fetched row batches into upload chunks of size rows (the last may be shorter)"""
+    rows = itertools.chain.from_iterable(batches)
+    while chunk := list(itertools.islice(rows, size)):
+        yield chunk
+
+
+def prefetch(iterable, maxsize=4):
+    """Iterate over iterable from a background thread, keeping up to maxsize items ready.
+
+    Lets the database fetch and payload encoding run while the caller is waiting
+    on uploads. Exceptions raised by the producer are re-raised in the caller.
+    """
+    items = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+
+    def put(entry):
+        # Give up once the consumer has stopped reading
+        while not stop.is_set():
+            try:
+                items.put(entry, timeout=0.5)
+                return True
+            except queue.Full:
+                pass
+        return False
 
+    def produce():
+        try:
+            for item in iterable:
+                if not put(("item", item)):
+                    return
+            put(("done", None))
+        except Exception as e:
+            put(("error", e))
+        finally:
+            if hasattr(iterable, 'close'):
+                iterable.close()
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    try:
+        while True:
+            kind, value = items.get()
+            if kind == "done":
+                return
+            if kind == "error":
+                raise value
+            yield value
+    finally:
+        stop.set()
+        producer.join()
+
+
+def table_query(table_name, query, watermarks, incremental=False):
+    """Return (query, params) restricted to the rows an incremental sync should send"""
+    column = WATERMARK_COLUMNS.get(table_name)
+    if column is None or not incremental:
+        return query, ()
+
+    conditions, params = [], ()
+    if watermarks.get(table_name) is not None:
+        conditions.append(f'"{column}" > ?')
+        params = (watermarks[table_name],)
+    if table_name in HOLD_BACK_NEWEST:
+        conditions.append(f'"{column}" < (SELECT MAX("{column}") FROM "{table_name}")')
+    if not conditions:
+        return query, ()
+
+    # The filter goes before any ORDER BY clause
+    head, order_by, tail = query.partition(" ORDER BY ")
+    keyword = "AND" if " WHERE " in head else "WHERE"
+    return f'{head} {keyword} {" AND ".join(conditions)}{order_by}{tail}', params
+
+
+def track_watermark(batches, index, watermark):
+    """Yield row batches unchanged while recording the highest key in watermark["value"]"""
+    for batch in batches:
+        keys = [row[index] for row in batch if row[index] is not None]
+        if keys:
+            highest = max(keys)
+            if watermark["value"] is None or highest > watermark["value"]:
+                watermark["value"] = highest
+        yield batch
+
+
+def table_digest(conn, query, params=()):
+    """Hash every row a query returns, used to detect tables that have not changed"""
+    digest = hashlib.blake2b(digest_size=16)
+    columns, batches = iter_rows(conn, query, params)
+    digest.update(orjson.dumps(columns))
+    for batch in batches:
+        digest.update(orjson.dumps([list(row) for row in batch], default=_json_default))
+    return digest.hexdigest()
+
+
+def get_server_etag(api_base_url, table_name):
+    """Return the ETag the server holds for a table, or None if it does not provide one"""
+    try:
+        response = SESSION.head(f"{api_base_url}/api/sync/{table_name}/etag", timeout=10)
+        if response.status_code == 200:
+            return response.headers.get('ETag', '').strip('"') or None
+    except Exception:
+        pass
+    return None
 
-def fetch_data(conn):
-    """Fetch data from all required tables"""
-    print("📊 FETCHING DATA FROM DATABASE")
-    print("-" * 50)
 
-    data = {}
+def make_chunk_encoder(columns, columnar=False):
+    """Return a function that encodes a batch of rows into the row fields of a chunk payload.
 
-    # Queries to fetch table
-    tables = [
-        ("acc_product", 'SELECT "code", "name", COALESCE("quantity", 0) + COALESCE("openingquantity", 0) AS quantity, "stockcatagory", "unit", "product", "brand", "billedcost", "basicprice", "partqty" FROM "acc_product"'),
-        
-        ("acc_invmast", 'SELECT "invdate", "slno" FROM "acc_invmast" WHERE "billno" > 1'),
-        
-        ("acc_invdetails", 'SELECT "invno", "code", "quantity" FROM "acc_invdetails"'),
-        
-        ("acc_purchasemaster", 'SELECT "slno", "date", "pdate" FROM "acc_purchasemaster" WHERE "billno" > 1'),
-        
-        ("acc_purchasedetails", 'SELECT "billno", "code", "quantity" FROM "acc_purchasedetails"'),
-        
-        ("acc_production", 'SELECT "productionno", "date" FROM "acc_production"'),
-        
-        ("acc_productiondetails", 'SELECT "masterno", "code", "qty" FROM "acc_productiondetails"'),
+    Rows are sent as a list of objects by default. In columnar mode the column
+    names are sent once and each row is a plain array, which cuts the payload
+    size for narrow tables; the API server must support this format. The fields
+    are returned as JSON bytes without the enclosing braces, ready to be spliced
+    into the payload by sync_table_chunks.
+    """
+    def encode(fields):
+        return orjson.dumps(fields, default=_json_default)[1:-1]
 
-        ("acc_users", 'SELECT "id", "pass" FROM "acc_users" WHERE "role" = \'Level 2\''),
-    ]
+    if columnar:
+        return lambda rows: encode({"columns": columns, "rows": [list(row) for row in rows]})
 
-    total_records = 0
+    # Compile one dict literal for this column list instead of zipping every row;
+    # the names come from cursor metadata and are embedded as repr() literals
+    source = "lambda r: {" + ", ".join(f"{column!r}: r[{i}]" for i, column in enumerate(columns)) + "}"
+    row_to_dict = eval(source, {})
+    return lambda rows: encode({"data": list(map(row_to_dict, rows))})
 
-    for i, (table_name, query) in enumerate(tables, 1):
-        print(f"{i}. Fetching {table_name}...", end=" ", flush=True)
 
-        results = execute_query(conn, query)
-           
-        # Rename 'pass' to 'pass_field' for acc_users
-        if table_name == "acc_users":
-            for record in results:
-                record['pass_field'] = record.pop('pass')
+def fetch_data(conn, watermarks=None, incremental=False):
+    """Count the records to sync in every table; rows are streamed later during upload"""
+    watermarks = watermarks or {}
+    print("📊 FETCHING DATA FROM DATABASE")
+    print("-" * 50)
 
+    counts = {}
+    total_records = 0
 
-        data[table_name] = results
+    for i, (table_name, query) in enumerate(SYNC_TABLES, 1):
+        print(f"{i}. Fetching {table_name}...", end=" ", flush=True)
 
-        print(f"✅ {len(results):,} records")
-        total_records += len(results)
+        count = count_rows(conn, *table_query(table_name, query, watermarks, incremental))
+        counts[table_name] = count
+
+        print(f"✅ {count:,} records")
+        total_records += count
 
     print("-" * 50)
     print(f"📈 TOTAL RECORDS TO SYNC: {total_records:,}")
     print()
 
-    return data
+    return counts
 
 
 def reset_sync_session(config):
@@ -179,7 +392,7 @@ def reset_sync_session(config):
         
         headers = {'Content-Type': 'application/json'}
         
-        response = requests.post(reset_endpoint, headers=headers, timeout=30)
+        response = SESSION.post(reset_endpoint, headers=headers, timeout=30)
         
         if response.status_code == 200:
             print("✅ Sync session reset on server")
@@ -193,7 +406,186 @@ def reset_sync_session(config):
         return False
 
 
-def sync_data_to_api(data, config):
+def chunk_timeout(rows, config):
+    """Return the (connect, read) timeout for a chunk, scaled by its row count"""
+    per_row_ms = config.get('per_row_timeout_ms', 180)
+    return (10, max(30, rows * per_row_ms / 1000))
+
+
+def _post_chunk(sync_endpoint, body, headers, timeout):
+    """POST a single encoded chunk to the sync endpoint and return (success, error)"""
+    try:
+        if headers.get('Content-Encoding') == 'gzip':
+            # Level 1 is several times faster than the default and still
+            # shrinks the highly repetitive row data the most
+            body = gzip.compress(body, compresslevel=1)
+
+        # Transient failures (connection errors, 502/503/504) are
+        # retried by the session's urllib3 Retry policy
+        response = SESSION.post(
+            sync_endpoint,
+            data=body,
+            headers=headers,
+            timeout=timeout
+        )
+
+        # Parse the raw bytes directly - response.text would first run charset
+        # detection and decode the whole body, even a large HTML error page
+        if response.status_code == 200:
+            response_data = orjson.loads(response.content) if response.content else {}
+            if response_data.get('success', False):
+                return True, None
+
+            error = f"API Error: {response_data.get('error', 'Unknown error')}"
+            if 'validation_errors' in response_data:
+                error += f"\n   📋 Validation errors: {response_data['validation_errors'][:2]}"
+            return False, error
+
+        try:
+            error_data = orjson.loads(response.content)
+            details = f"Error details: {error_data}"
+        except:
+            snippet = response.content[:200].decode('utf-8', 'replace')
+            details = f"Response text: {snippet}"
+        return False, f"Request failed (Status: {response.status_code})\n   📋 {details}"
+
+    except Exception as e:
+        return False, f"Request failed (Error: {str(e)})"
+
+
+def sync_table_chunks(table_name, chunks, total, sync_endpoint, headers, config, truncate=True,
+                      deadline=None):
+    """Upload the chunks of one table, sending the middle batches concurrently"""
+    workers = config.get('parallel_chunks', 4)
+    connect_timeout, read_timeout = chunk_timeout(CHUNK_SIZE, config)
+    batch_deadline = (connect_timeout + read_timeout) * (MAX_RETRIES + 1)
+
+    # Payload for Django REST API, assembled from pre-encoded pieces: the
+    # database/table header is the same for every chunk of the table
+    header = orjson.dumps({
+        "database": config.get('target_database', 'OMEGA'),
+        "table": table_name,
+    })[:-1] + b','
+
+    def payload_for(chunk, is_first_batch, is_last_batch):
+        flags = orjson.dumps({"is_first_batch": is_first_batch, "is_last_batch": is_last_batch})
+        return header + chunk + b',' + flags[1:]
+
+    def remaining():
+        # Seconds left before the overall deadline, or None without one
+        return None if deadline is None else deadline - time.monotonic()
+
+    def clamp(timeout):
+        # Keep a request's connect + read timeouts within the time left
+        left = remaining()
+        if left is None:
+            return timeout
+        connect, read = timeout
+        connect = min(connect, left / 2)
+        return (connect, min(read, left - connect))
+
+    def fail(error):
+        progress.close()
+        print(f"\n❌ Failed to sync {table_name}: {error}")
+        return False
+
+    chunks = iter(chunks)
+    chunk = next(chunks, None)
+    # tqdm redraws at most every 0.1s, so updates from the parallel upload
+    # loop do not each cost a stdout write and flush
+    # The --noconsole build has no stdout; tqdm would fail writing to None, so
+    # run it disabled there (messages go through print, also a no-op then)
+    progress = tqdm(total=total, desc="   Batches", unit="batch", file=sys.stdout,
+                    disable=sys.stdout is None)
+
+    # Not a with-block: on failure, cancel queued batches and return without
+    # waiting for a stalled one
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        pending = set()
+
+        def collect(return_when):
+            # Wait for in-flight batches and return the first error, if any
+            nonlocal pending
+            while pending:
+                limit = batch_deadline
+                left = remaining()
+                if left is not None:
+                    if left <= 0:
+                        return "Sync deadline exceeded"
+                    limit = min(limit, left)
+                finished, pending = wait(pending, timeout=limit, return_when=FIRST_COMPLETED)
+                error = record(finished)
+                if error:
+                    return error
+                if not finished:
+                    if left is not None and limit == left:
+                        return "Sync deadline exceeded"
+                    return f"Batch did not complete within {batch_deadline:.0f}s"
+                if return_when == FIRST_COMPLETED:
+                    break
+            left = remaining()
+            if left is not None and left <= 0:
+                return "Sync deadline exceeded"
+            return None
+
+        def record(finished):
+            for future in finished:
+                success, error = future.result()
+                if not success:
+                    return error
+                progress.update(1)
+            return None
+
+        is_first_batch = True
+        while chunk is not None:
+            left = remaining()
+            if left is not None and left <= 0:
+                return fail("Sync deadline exceeded")
+
+            next_chunk = next(chunks, None)
+            is_last_batch = next_chunk is None
+            # chunks yields (encoded rows, row count) pairs
+            body, rows = chunk
+            payload = payload_for(body, is_first_batch and truncate, is_last_batch)
+            timeout = clamp(chunk_timeout(rows, config))
+
+            # The first batch truncates the server table, so it goes alone; the last is
+            # held until every other batch is accepted. truncate=False appends instead
+            if is_first_batch or is_last_batch:
+                error = collect(ALL_COMPLETED)
+                if error:
+                    return fail(error)
+                success, error = _post_chunk(sync_endpoint, payload, headers, timeout)
+                if not success:
+                    return fail(error)
+                left = remaining()
+                if left is not None and left <= 0:
+                    return fail("Sync deadline exceeded")
+                if is_first_batch and truncate:
+                    message = f"   🔥 Table {table_name} truncated and first batch inserted"
+                    if progress.disable:
+                        print(message)
+                    else:
+                        progress.write(message)
+                progress.update(1)
+            else:
+                pending.add(executor.submit(_post_chunk, sync_endpoint, payload, headers, timeout))
+                if len(pending) >= workers * 2:
+                    error = collect(FIRST_COMPLETED)
+                    if error:
+                        return fail(error)
+
+            is_first_batch = False
+            chunk = next_chunk
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    progress.close()
+    return True
+
+
+def sync_data_to_api(conn, counts, config, state):
     """Sync data to the API server using the /api/sync endpoint with proper batch handling"""
     try:
         api_base_url = config['api']['url']
@@ -201,105 +593,96 @@ def sync_data_to_api(data, config):
         print(f"🌐 API Server: {api_base_url}")
         print()
 
+        mount_session(api_base_url, pool_size=config.get('parallel_chunks', 4))
+
         # Reset sync session to clear any previous truncation tracking
         reset_sync_session(config)
 
         headers = {
             'Content-Type': 'application/json'
         }
+        if config.get('compress_requests', False):
+            headers['Content-Encoding'] = 'gzip'
 
         # API endpoint 
         sync_endpoint = f"{api_base_url}/api/sync"
 
-        # Tables to sync 
-        tables_to_sync = ["acc_product", "acc_invmast", "acc_invdetails", "acc_purchasemaster", "acc_purchasedetails", "acc_production", "acc_productiondetails", "acc_users"]
+        columnar = config.get('payload_format', 'json') == 'columnar'
+
+        skip_unchanged = config.get('skip_unchanged_tables', False)
+        incremental = config.get('incremental_sync', False)
+        watermarks = dict(state["watermarks"]) if incremental else {}
+
+        # Optional cap on the whole upload, so a stalled run gives up instead of hanging
+        deadline = None
+        if config.get('sync_deadline_seconds'):
+            deadline = time.monotonic() + config['sync_deadline_seconds']
 
         print("📤 SYNCING DATA TO API")
         print("-" * 50)
 
-        # Using batch size from your Node.js config
-        def chunk_data(data_list, chunk_size=1000):
-            for i in range(0, len(data_list), chunk_size):
-                yield data_list[i:i + chunk_size]
-
-        for table_index, table_name in enumerate(tables_to_sync, 1):
-            if table_name in data:
-                table_data = data[table_name]
-                if not table_data:
+        for table_index, (table_name, query) in enumerate(SYNC_TABLES, 1):
+            if table_name in counts:
+                count = counts[table_name]
+                if not count:
                     print(f"{table_index}. {table_name}: No data to sync")
                     continue
 
+                query, params = table_query(table_name, query, watermarks, incremental)
+                append = watermarks.get(table_name) is not None
+
+                if skip_unchanged:
+                    etag = table_digest(conn, query, params)
+                    server_etag = get_server_etag(api_base_url, table_name)
+                    if state["tables"].get(table_name) == etag and server_etag in (None, etag):
+                        print(f"{table_index}. ⏭  {table_name} unchanged - skipped")
+                        continue
+                    # Forget the old ETag until this upload completes, so a run
+                    # interrupted mid-table never skips it next time
+                    state["tables"].pop(table_name, None)
+                    save_sync_state(state)
+
                 print(
-                    f"{table_index}. Syncing {len(table_data):,} records from {table_name}...")
-
-                chunks = list(chunk_data(table_data, chunk_size=1000))
-
-                for chunk_index, chunk in enumerate(chunks, 1):
-                    print_progress_bar(
-                        chunk_index - 1, len(chunks), f"   Batch {chunk_index}/{len(chunks)}")
-
-                    # Determine if this is first/last batch
-                    is_first_batch = (chunk_index == 1)
-                    is_last_batch = (chunk_index == len(chunks))
-
-                    # Prepare payload for Django REST API
-                    payload = {
-                        "database": config.get('target_database', 'OMEGA'),
-                        "table": table_name,
-                        "data": chunk,
-                        "is_first_batch": is_first_batch,
-                        "is_last_batch": is_last_batch
-                    }
-
-                    success = False
-                    for retry in range(3):  # 3 retries
-                        try:
-                            response = requests.post(
-                                sync_endpoint,
-                                data=json.dumps(payload, cls=DecimalEncoder),
-                                headers=headers,
-                                timeout=180  # 3 minutes timeout
-                            )
-
-                            if response.status_code == 200:
-                                response_data = response.json()
-                                if response_data.get('success', False):
-                                    success = True
-                                    # Log batch completion info
-                                    if is_first_batch:
-                                        print(f"\n   🔥 Table {table_name} truncated and first batch inserted")
-                                    break
-                                else:
-                                    print(
-                                        f"\n   ⚠️  API Error: {response_data.get('error', 'Unknown error')}")
-                                    if 'validation_errors' in response_data:
-                                        print(
-                                            f"   📋 Validation errors: {response_data['validation_errors'][:2]}")
-                            else:
-                                print(
-                                    f"\n   ⚠️  Retry {retry + 1}/3 (Status: {response.status_code})")
-                                try:
-                                    error_data = response.json()
-                                    print(f"   📋 Error details: {error_data}")
-                                except:
-                                    print(
-                                        f"   📋 Response text: {response.text[:200]}")
-                                time.sleep(2)
-
-                        except Exception as e:
-                            print(
-                                f"\n   ⚠️  Retry {retry + 1}/3 (Error: {str(e)})")
-                            time.sleep(2)
-
-                    print_progress_bar(chunk_index, len(
-                        chunks), f"   Batch {chunk_index}/{len(chunks)}")
-
-                    if not success:
-                        print(
-                            f"\n❌ Failed to sync {table_name} after 3 attempts")
-                        return False
-
-                print(f"   ✅ {table_name} synced successfully! (Total: {len(table_data):,} records)")
+                    f"{table_index}. Syncing {count:,} records from {table_name}...")
+
+                columns, batches = iter_rows(conn, query, params)
+                # Track the watermark on every upload, full ones included, so it
+                # always matches what the server holds if incremental sync is
+                # switched on later
+                watermark = {"value": watermarks.get(table_name)}
+                if table_name in WATERMARK_COLUMNS:
+                    index = columns.index(WATERMARK_COLUMNS[table_name])
+                    batches = track_watermark(batches, index, watermark)
+                    # Forget the stored watermark until this upload completes: after
+                    # an interrupted run the next one reloads the table in full
+                    # instead of appending on top of partly uploaded rows
+                    state["watermarks"].pop(table_name, None)
+                    save_sync_state(state)
+                renames = COLUMN_RENAMES.get(table_name, {})
+                columns = [renames.get(column, column) for column in columns]
+                encode = make_chunk_encoder(columns, columnar)
+                chunks = prefetch((encode(batch), len(batch)) for batch in rechunk(batches))
+                total = -(-count // CHUNK_SIZE)
+
+                try:
+                    synced = sync_table_chunks(table_name, chunks, total, sync_endpoint, headers,
+                                               config, truncate=not append, deadline=deadline)
+                finally:
+                    chunks.close()
+                if not synced:
+                    return False
+
+                if skip_unchanged:
+                    state["tables"][table_name] = etag
+                # A full upload of a detail table includes its newest, possibly
+                # still open, document; leave no watermark so incremental sync
+                # starts over with a reload instead of missing that document's
+                # later lines
+                if table_name in WATERMARK_COLUMNS and (incremental or table_name not in HOLD_BACK_NEWEST):
+                    state["watermarks"][table_name] = watermark["value"]
+                save_sync_state(state)
+
+                print(f"   ✅ {table_name} synced successfully! (Total: {count:,} records)")
                 print()
 
         return True
@@ -321,11 +704,16 @@ def main():
         # Connect to database
         conn = connect_to_database(config)
 
-        # Fetch data
-        data = fetch_data(conn)
+        # Load state from previous runs (ETags and incremental watermarks)
+        state = load_sync_state(config)
+        incremental = config.get('incremental_sync', False)
+        watermarks = state["watermarks"] if incremental else {}
+
+        # Count records to sync
+        counts = fetch_data(conn, watermarks, incremental)
 
-        # Sync data to API
-        success = sync_data_to_api(data, config)
+        # Stream data from the database to the API
+        success = sync_data_to_api(conn, counts, config, state)
 
         # Close connection
         conn.close()